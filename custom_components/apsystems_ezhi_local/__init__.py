@@ -5,18 +5,15 @@ from __future__ import annotations
 import asyncio
 from datetime import timedelta
 import logging
-from time import monotonic
 
 import voluptuous as vol
-from aiohttp import client_exceptions
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_IP_ADDRESS, Platform
+from homeassistant.const import CONF_IP_ADDRESS, CONF_NAME, Platform
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryAuthFailed, HomeAssistantError
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers import device_registry as dr
-from homeassistant.helpers.event import async_track_time_interval
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from .const import (
     DOMAIN,
@@ -43,8 +40,12 @@ _LOGGER = logging.getLogger(__name__)
 PLATFORMS: list[Platform] = [
     Platform.SENSOR,
     Platform.NUMBER,
-    Platform.SWITCH,
     Platform.BINARY_SENSOR,
+]
+# Only cloud-backed entities live on these two, so a local-only entry does
+# not set them up at all rather than loading them to add nothing.
+CLOUD_PLATFORMS: list[Platform] = [
+    Platform.SWITCH,
     Platform.SELECT,
 ]
 
@@ -94,7 +95,11 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up this integration using UI."""
     hass.data.setdefault(DOMAIN, {})
     
-    api = APsystemsEZHI(ip_address=entry.data[CONF_IP_ADDRESS], timeout=8)
+    api = APsystemsEZHI(
+        ip_address=entry.data[CONF_IP_ADDRESS],
+        session=async_get_clientsession(hass),
+        timeout=8,
+    )
     
     # Get intervals (with legacy fallback)
     legacy_interval = entry.data.get(UPDATE_INTERVAL, DEFAULT_SCAN_INTERVAL_OUTPUT)
@@ -102,14 +107,24 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     alarm_interval = entry.data.get(SCAN_INTERVAL_ALARM, DEFAULT_SCAN_INTERVAL_ALARM)
     
     coordinator = ApSystemsDataCoordinator(
-        hass, api,
+        hass, entry, api,
+        device_name=entry.data[CONF_NAME],
         output_interval=output_interval,
         alarm_interval=alarm_interval,
     )
     
     # Fetch initial data BEFORE setting up platforms
-    # This ensures device_info is available for device registration
-    await coordinator.async_fetch_initial_data()
+    # This ensures device_info is available for device registration.
+    # Three independent GETs against the same host: issued together, setup
+    # waits for the slowest of them instead of for their sum. The output
+    # half goes through the coordinator's own first refresh, so an inverter
+    # that does not answer raises ConfigEntryNotReady and Home Assistant
+    # retries the setup, instead of starting with no data at all.
+    await asyncio.gather(
+        coordinator.async_prefetch_device_info(),
+        coordinator.async_prefetch_alarm(),
+        coordinator.async_config_entry_first_refresh(),
+    )
 
     # --- optional cloud control layer ---------------------------------------
     # Strictly isolated: every failure path here leaves the local sensors alone.
@@ -177,12 +192,19 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             "enable it."
         )
 
+    platforms = PLATFORMS if cloud_coordinator is None else PLATFORMS + CLOUD_PLATFORMS
     hass.data[DOMAIN][entry.entry_id] = {
         **entry.data,
         "COORDINATOR": coordinator,
         CLOUD_COORDINATOR: cloud_coordinator,
+        # Unload must name exactly what was set up: unloading a platform this
+        # entry never forwarded to is an error, not a no-op.
+        "PLATFORMS": platforms,
     }
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    await hass.config_entries.async_forward_entry_setups(entry, platforms)
+    # The entities have just created the device; fill in what the inverter
+    # told us about itself.
+    coordinator.async_sync_device_registry()
 
     # Register the set_power service
     async def set_power_service(call):
@@ -190,14 +212,14 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         # one this setup closed over, which would be the last entry loaded.
         entry_data = _resolve_entry_data(hass, call)
         api = entry_data["COORDINATOR"].api
-        power = call.data["power"]
-        _LOGGER.debug("Setting power for %s watts", power)
-        if power < MIN_VALUE:
-            _LOGGER.warning("Power value %s is below minimum %s", power, MIN_VALUE)
-            power = MIN_VALUE
-        elif power > MAX_VALUE:
-            _LOGGER.warning("Power value %s is above maximum %s", power, MAX_VALUE)
-            power = MAX_VALUE
+        requested = call.data["power"]
+        _LOGGER.debug("Setting power for %s watts", requested)
+        power = min(MAX_VALUE, max(MIN_VALUE, requested))
+        if power != requested:
+            _LOGGER.warning(
+                "Power value %s is outside %s to %s W, clamped to %s",
+                requested, MIN_VALUE, MAX_VALUE, power,
+            )
         # The number entity is the other way to write this value and warns the
         # same way. An automation calling the service is the likelier of the
         # two to be writing into a mode that discards it, unattended.
@@ -209,6 +231,8 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
                 power, mode,
             )
         await api.set_power(power)
+        # So the number entity shows the new setpoint now, not a minute later.
+        await entry_data["COORDINATOR"].async_refresh_power_limit()
 
     if not hass.services.has_service(DOMAIN, "set_power"):
         hass.services.async_register(
@@ -267,13 +291,14 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    coordinator = hass.data[DOMAIN][entry.entry_id]["COORDINATOR"]
-    coordinator.stop_alarm_timer()
-    # The cloud coordinator (if any) needs no explicit cleanup here:
+    # Neither coordinator needs explicit cleanup here:
     # DataUpdateCoordinator.__init__ already registers
-    # async_on_unload(self.async_shutdown) for itself.
+    # async_on_unload(self.async_shutdown) for itself, and the alarm poll
+    # rides on the local one's schedule rather than a timer of its own.
 
-    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    unload_ok = await hass.config_entries.async_unload_platforms(
+        entry, hass.data[DOMAIN][entry.entry_id]["PLATFORMS"]
+    )
 
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id)
@@ -292,18 +317,15 @@ async def update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
     await hass.config_entries.async_reload(entry.entry_id)
 
 
-class InverterNotAvailable(Exception):
-    """Exception raised when the inverter is not available."""
-    pass
-
-
 class ApSystemsDataCoordinator(DataUpdateCoordinator):
     """Class to manage fetching data from the API."""
 
     def __init__(
         self,
         hass: HomeAssistant,
+        entry: ConfigEntry,
         api: APsystemsEZHI,
+        device_name: str,
         output_interval: int = DEFAULT_SCAN_INTERVAL_OUTPUT,
         alarm_interval: int = DEFAULT_SCAN_INTERVAL_ALARM,
     ):
@@ -311,141 +333,221 @@ class ApSystemsDataCoordinator(DataUpdateCoordinator):
         super().__init__(
             hass,
             _LOGGER,
+            config_entry=entry,
             name="APsystems EZHI Data",
             update_interval=timedelta(seconds=output_interval),
+            # An idle battery at night answers the same numbers poll after
+            # poll. ReturnOutputData is a frozen dataclass, so an identical
+            # poll compares equal and wakes no entity at all.
+            always_update=False,
         )
         self.api = api
-        self.always_update = True
+        self.device_name = device_name
         self.device_info: ReturnDeviceInfo | None = None
+        # What async_sync_device_registry last wrote, so an unchanged
+        # getDeviceInfo re-read after an outage is not a registry write.
+        self._registry_device_info: tuple[str, str, str] | None = None
         self.alarm_data: ReturnAlarmData | None = None
+        self._output_interval = output_interval
         self._alarm_interval = alarm_interval
-        self._alarm_unsub = None
-    
-    async def async_fetch_initial_data(self) -> None:
-        """Fetch initial data before platforms are set up."""
-        # Fetch device info first - needed for device registration
-        try:
-            self.device_info = await self.api.get_device_info()
-            _LOGGER.debug("Initial device info loaded: %s", self.device_info.deviceId)
-        except Exception as e:
-            _LOGGER.warning("Failed to get initial device info: %s", e)
-        
-        # Fetch alarm data
-        try:
-            self.alarm_data = await self.api.get_alarm()
-        except Exception as e:
-            _LOGGER.warning("Failed to get initial alarm data: %s", e)
-        
-        # Fetch initial output data
-        try:
-            self.data = await self.api.get_output_data()
-        except Exception as e:
-            _LOGGER.warning("Failed to get initial output data: %s", e)
-        
-        # Now start the periodic timer for alarm/device updates
-        self._start_alarm_timer()
+        # Loop time the next output poll should also fetch alarm and device
+        # info by. Counted from now, because setup prefetches both right
+        # after constructing this.
+        self._next_alarm_due = hass.loop.time() + alarm_interval
+        # getAlarm misses in a row; two of them make the next alarm tick
+        # re-read the device info as well.
+        self._alarm_failures = 0
+        # Whether the last getDeviceInfo went unanswered, so that only the
+        # first of a run of failures is a warning.
+        self._device_info_failing = False
+        # The on-grid power setpoint from getPower, for the number entity.
+        # Read on alarm ticks, and on the next poll when stale: after a write
+        # or a read that failed while the inverter answered otherwise -- and
+        # at first, so the first refresh reads it.
+        self.power_limit: int | None = None
+        self._power_stale = True
     
-    def _start_alarm_timer(self) -> None:
-        """Start the timer for alarm and device info updates."""
-        @callback
-        def _async_alarm_update(_now=None):
-            """Trigger alarm and device info update."""
-            self.hass.async_create_task(self._async_update_alarm_and_device())
-        
-        # Schedule periodic updates (initial fetch already done)
-        self._alarm_unsub = async_track_time_interval(
-            self.hass,
-            _async_alarm_update,
-            timedelta(seconds=self._alarm_interval),
+    async def async_prefetch_device_info(self) -> None:
+        """Fetch device info before platforms are set up.
+
+        Device registration and the cloud layer's deviceId both read it. A
+        failure is not fatal here: the next alarm tick tries again.
+        """
+        device_info = await self.api.get_device_info()
+        if device_info is None:
+            _LOGGER.warning("Failed to get initial device info")
+            return
+        self.device_info = device_info
+        _LOGGER.debug("Initial device info loaded: %s", device_info.deviceId)
+
+    async def async_prefetch_alarm(self) -> None:
+        """Fetch alarm data before platforms are set up."""
+        alarm_data = await self.api.get_alarm()
+        if alarm_data is None:
+            _LOGGER.warning("Failed to get initial alarm data")
+            return
+        self.alarm_data = alarm_data
+
+    def _apply_alarm(self, alarm_data: ReturnAlarmData | None) -> bool:
+        """Store a fetched alarm reading; True if it changed.
+
+        None is a getAlarm that got no answer: the previous reading stays,
+        and the miss is counted towards re-probing the device info.
+
+        Only the first miss of a run is a warning. An inverter that is off
+        all night would otherwise log a line every alarm tick until morning,
+        and the output poll already says once that it went away.
+        """
+        if alarm_data is None:
+            self._alarm_failures += 1
+            log = _LOGGER.warning if self._alarm_failures == 1 else _LOGGER.debug
+            log("Failed to get alarm data (%d in a row)", self._alarm_failures)
+            return False
+        self._alarm_failures = 0
+        if alarm_data == self.alarm_data:
+            return False
+        self.alarm_data = alarm_data
+        return True
+
+    def _apply_power_limit(self, power: int | None, retry: bool) -> bool:
+        """Store a fetched setpoint; True if it changed.
+
+        None keeps the previous value. With retry -- the inverter answered
+        the output read alongside -- it is asked again on the next poll
+        rather than after a whole alarm interval. Without, the inverter is
+        away, and a second request on every failed poll would only add
+        timeouts; the next alarm tick tries again.
+        """
+        if power is None:
+            self._power_stale = retry
+            return False
+        if power == self.power_limit:
+            return False
+        self.power_limit = power
+        return True
+
+    async def async_refresh_power_limit(self) -> None:
+        """Re-read the setpoint on a refresh requested now, e.g. after a write."""
+        self._power_stale = True
+        await self.async_request_refresh()
+
+    def _apply_device_info(self, device_info: ReturnDeviceInfo | None) -> bool:
+        """Store a fetched device info; True if it changed.
+
+        Warns once per run of failures, like _apply_alarm: while getAlarm
+        keeps failing this is re-read every tick.
+        """
+        if device_info is None:
+            log = _LOGGER.debug if self._device_info_failing else _LOGGER.warning
+            log("Failed to get device info")
+            self._device_info_failing = True
+            return False
+        self._device_info_failing = False
+        if device_info == self.device_info:
+            return False
+        self.device_info = device_info
+        self.async_sync_device_registry()
+        return True
+
+    @callback
+    def async_sync_device_registry(self) -> None:
+        """Write firmware version, serial and URL to the device registry.
+
+        Once per change rather than once per entity lookup: the entities
+        carry a static DeviceInfo, and these three are the only parts of it
+        the inverter reports. Quietly does nothing until the device exists --
+        async_setup_entry calls this again once the platforms have created it.
+        """
+        dev = self.device_info
+        if dev is None:
+            return
+        reported = (dev.devVer, dev.deviceId, dev.ip)
+        if reported == self._registry_device_info:
+            return
+        device_registry = dr.async_get(self.hass)
+        device = device_registry.async_get_device(
+            identifiers={(DOMAIN, self.device_name)}
         )
-    
-    def stop_alarm_timer(self) -> None:
-        """Stop the alarm timer."""
-        if self._alarm_unsub:
-            self._alarm_unsub()
-            self._alarm_unsub = None
-    
-    async def _async_update_alarm_and_device(self) -> None:
-        """Update alarm and device info data."""
-        try:
-            # Fetch device info
-            try:
-                self.device_info = await self.api.get_device_info()
-            except Exception as e:
-                _LOGGER.warning("Failed to get device info: %s", e)
-            
-            # Fetch alarm data
-            try:
-                self.alarm_data = await self.api.get_alarm()
-            except Exception as e:
-                _LOGGER.warning("Failed to get alarm data: %s", e)
-            
-            # Notify listeners that data has changed
-            self.async_update_listeners()
-            
-        except Exception as e:
-            _LOGGER.error("Error updating alarm/device data: %s", e)
-
-    async def _async_update_data(self) -> ReturnOutputData | None:
-        """Update output data via library (fast interval)."""
-        try:
-            data = await self.api.get_output_data()
-            return data
-        except (TimeoutError, client_exceptions.ClientConnectionError):
-            raise InverterNotAvailable()
-
-    async def _async_refresh(
-        self,
-        log_failures: bool = True,
-        raise_on_auth_failed: bool = False,
-        scheduled: bool = False,
-        raise_on_entry_error: bool = False,
-    ) -> None:
-        """Refresh data and handle failures appropriately."""
-        self._async_unsub_refresh()
-        self._debounced_refresh.async_cancel()
-        if self._shutdown_requested or scheduled and self.hass.is_stopping:
+        if device is None:
             return
-
-        if log_timing := self.logger.isEnabledFor(logging.DEBUG):
-            start = monotonic()
-
-        auth_failed = False
-        previous_update_success = self.last_update_success
-        previous_data = self.data
-        exc_triggered = False
-        try:
-            self.data = await self._async_update_data()
-        except InverterNotAvailable:
-            self.last_update_success = False
-            exc_triggered = True
-        except Exception as err:
-            self.last_exception = err
-            self.last_update_success = False
-            self.logger.exception("Unexpected error fetching %s data", self.name)
-            exc_triggered = True
+        # Only what the inverter actually sent: an empty field leaves the
+        # registry's value alone instead of clearing it.
+        changes = {}
+        if dev.devVer:
+            changes["sw_version"] = dev.devVer
+        if dev.deviceId:
+            changes["serial_number"] = dev.deviceId
+        if dev.ip:
+            changes["configuration_url"] = f"http://{dev.ip}/getDeviceInfo"
+        device_registry.async_update_device(device.id, **changes)
+        self._registry_device_info = reported
+
+    async def _async_update_data(self) -> ReturnOutputData:
+        """Update output data via library (fast interval).
+
+        Alarm data has no timer of its own: the output poll nearest its
+        deadline fetches it too, both requests going out together. One
+        schedule, one listener update per tick, and the alarm interval is
+        effectively rounded to a whole number of output polls.
+
+        Device info is firmware version, serial and IP -- it changes with a
+        firmware update, not by the minute. It is read at setup and then only
+        while it is still missing, or once getAlarm has failed twice running:
+        an inverter that went away may come back reflashed or readdressed.
+
+        The power setpoint rides on the alarm tick too, or on the very next
+        poll when something marked it stale.
+
+        A deadline rather than counting polls, because async_request_refresh
+        (after a power change) adds polls the count would mistake for time.
+        """
+        now = self.hass.loop.time()
+        # Half an output interval of slack: the base class schedules polls
+        # with a sub-second jitter, and comparing exactly would sometimes
+        # leave the alarm waiting a whole extra poll for a millisecond.
+        alarm_tick = now >= self._next_alarm_due - self._output_interval / 2
+        read_power = alarm_tick or self._power_stale
+        read_device = alarm_tick and (
+            self.device_info is None or self._alarm_failures >= 2
+        )
+        requests = [self.api.get_output_data()]
+        if alarm_tick:
+            self._next_alarm_due = now + self._alarm_interval
+            requests.append(self.api.get_alarm())
+        if read_power:
+            self._power_stale = False
+            requests.append(self.api.get_power())
+        if read_device:
+            requests.append(self.api.get_device_info())
+        # Results in request order; each flag above claims its own.
+        results = iter(await asyncio.gather(*requests))
+        output_data = next(results)
+        changed = False
+        if alarm_tick:
+            changed |= self._apply_alarm(next(results))
+        if read_power:
+            changed |= self._apply_power_limit(
+                next(results), retry=output_data is not None
+            )
+        if read_device:
+            changed |= self._apply_device_info(next(results))
+        # data's own __eq__ cannot see alarm data, the setpoint or device
+        # info. The base class wakes the listeners when last_update_success
+        # flips or the readings changed; when it is going to leave them alone
+        # -- another failed poll, or identical readings -- a change in those
+        # has to wake them here.
+        if output_data is None:
+            quiet = not self.last_update_success
         else:
-            if not self.last_update_success and not exc_triggered:
-                self.last_update_success = True
-                self.logger.info("Fetching %s data recovered", self.name)
-        finally:
-            if log_timing:
-                self.logger.debug(
-                    "Finished fetching %s data in %.3f seconds (success: %s)",
-                    self.name,
-                    monotonic() - start,
-                    self.last_update_success,
-                )
-            if not auth_failed and self._listeners and not self.hass.is_stopping:
-                self._schedule_refresh()
-        if not self.last_update_success and not previous_update_success:
-            return
-        if (
-            self.always_update
-            or self.last_update_success != previous_update_success
-            or previous_data != self.data
-        ):
+            quiet = self.last_update_success and output_data == self.data
+        if changed and quiet:
             self.async_update_listeners()
+        if output_data is None:
+            # UpdateFailed, so the base class's own refresh handles it: marks
+            # the entities unavailable and logs once on the way down and once
+            # on recovery, rather than a line on every failed poll.
+            raise UpdateFailed("inverter not available")
+        return output_data
 
 
 class ApSystemsCloudCoordinator(DataUpdateCoordinator):
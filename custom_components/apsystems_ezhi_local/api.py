@@ -3,10 +3,12 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import math
 from dataclasses import dataclass
-from typing import Any, Optional
+from typing import Any, Callable, Optional
 
 import aiohttp
+import orjson
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -32,99 +34,236 @@ class ReturnDeviceInfo:
     ip: str
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ReturnOutputData:
-    """Class for return output data."""
+    """Class for return output data.
+
+    Typed, not the raw strings the firmware sends: parsing happens once per
+    poll in parse_output_data, not once per sensor read. Frozen so two polls
+    compare field-wise, which is what lets the coordinator skip identical ones.
+
+    A reading that is missing or does not parse is None, which the sensor
+    shows as unknown. Not 0: an energy total dropping to 0 and back is
+    counted by the statistics as a meter reset, a whole lifetime's kWh again.
+    Not NaN either: NaN != NaN would make every such poll look changed.
+    """
     # Battery status
-    batS: str
+    batS: int
     # Battery state of charge (%)
-    batSoc: str
+    batSoc: int | None
     # Battery state of health (%)
-    batSoh: str
+    batSoh: float | None
     # Battery temperature (℃)
-    batTemp: str
+    batTemp: float | None
     # Device temperature (℃)
-    devTemp: str
+    devTemp: float | None
     # Photovoltaic input power (W)
-    pvP: str
+    pvP: float | None
     # Total photovoltaic input energy (kWh)
-    pvTE: str
+    pvTE: float | None
     # Battery power (W)
-    batP: str
+    batP: float | None
     # Total battery charge energy (kWh)
-    batCTE: str
+    batCTE: float | None
     # Total battery discharge energy (kWh)
-    batDTE: str
+    batDTE: float | None
     # On-grid power (W)
-    ogP: str
+    ogP: float | None
     # Total on-grid output energy (kWh)
-    ogOTE: str
+    ogOTE: float | None
     # Total on-grid input energy (kWh)
-    ogITE: str
+    ogITE: float | None
     # Off-grid power (W)
-    ofgP: str
+    ofgP: float | None
     # Total off-grid output energy (kWh)
-    ofgOTE: str
+    ofgOTE: float | None
     # Total off-grid input energy (kWh)
-    ofgITE: str
+    ofgITE: float | None
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ReturnAlarmData:
-    """Class for return alarm data."""
-    BatHTP: str  # Battery high temperature protection
-    BatLTP: str  # Battery low temperature protection
-    BatCE: str   # Battery communication error
-    BatHV: str   # Battery overvoltage
-    BatLV: str   # Battery undervoltage
-    BatHI: str   # Battery overcurrent
-    BatE: str    # Battery error
-    DTP: str     # Device temperature protection
-    EE: str      # Device error
-    SBS: str     # Battery shutdown
-    ACA: str     # AC abnormal
-    OfOI: str    # Off grid over current alarm
-    PvHV: str    # PV high voltage
-    PvOC: str    # PV over current
-    IRDE: str    # IRD error
-    PVWE: str    # PV wiring error
-    OfGS: str    # Off grid short circuit
-    # Reported by getAlarm but previously unmapped. Default to "" rather than
-    # "0": firmware that does not send them should read as "unknown", not as a
-    # confident "no problem". BCI in particular is a safety-relevant claim.
-    BCC: str = ""   # SOC calibration needed
-    BCI: str = ""   # Battery access conflict
-    VRP: str = ""   # Voltage reset protection
+    """Class for return alarm data. 1 is raised, 0 is clear."""
+    BatHTP: int  # Battery high temperature protection
+    BatLTP: int  # Battery low temperature protection
+    BatCE: int   # Battery communication error
+    BatHV: int   # Battery overvoltage
+    BatLV: int   # Battery undervoltage
+    BatHI: int   # Battery overcurrent
+    BatE: int    # Battery error
+    DTP: int     # Device temperature protection
+    EE: int      # Device error
+    SBS: int     # Battery shutdown
+    ACA: int     # AC abnormal
+    OfOI: int    # Off grid over current alarm
+    PvHV: int    # PV high voltage
+    PvOC: int    # PV over current
+    IRDE: int    # IRD error
+    PVWE: int    # PV wiring error
+    OfGS: int    # Off grid short circuit
+    # Reported by getAlarm but previously unmapped. Default to None rather
+    # than 0: firmware that does not send them should read as "unknown", not
+    # as a confident "no problem". BCI in particular is a safety-relevant claim.
+    BCC: int | None = None   # SOC calibration needed
+    BCI: int | None = None   # Battery access conflict
+    VRP: int | None = None   # Voltage reset protection
+
+
+# The alarm fields older firmware may leave out entirely; see ReturnAlarmData.
+_OPTIONAL_ALARM_FIELDS = frozenset({"BCC", "BCI", "VRP"})
+
+
+def _as_int(raw: Any) -> int:
+    """An API field as int. The firmware sends numbers as strings, and an
+    unparseable one reads as 0 -- what the sensors fell back to before."""
+    try:
+        return int(float(raw))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _reading(raw: Any) -> float | None:
+    """An output reading as float, or None when it is missing or unusable.
+
+    "nan" and "inf" parse as floats, so they are refused explicitly.
+    """
+    try:
+        value = float(raw)
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) else None
+
+
+def _int_reading(raw: Any) -> int | None:
+    """An output reading as int, with the same None fallback as _reading."""
+    value = _reading(raw)
+    return None if value is None else int(value)
+
+
+# ReturnOutputData's fields after batS, in declaration order, each with its
+# parser. Order matters: parse_output_data passes them positionally.
+_OUTPUT_FIELDS: tuple[tuple[str, Callable[[Any], Any]], ...] = (
+    ("batSoc", _int_reading),
+    ("batSoh", _reading),
+    ("batTemp", _reading),
+    ("devTemp", _reading),
+    ("pvP", _reading),
+    ("pvTE", _reading),
+    ("batP", _reading),
+    ("batCTE", _reading),
+    ("batDTE", _reading),
+    ("ogP", _reading),
+    ("ogOTE", _reading),
+    ("ogITE", _reading),
+    ("ofgP", _reading),
+    ("ofgOTE", _reading),
+    ("ofgITE", _reading),
+)
+
+
+def parse_output_data(response: dict) -> ReturnOutputData:
+    """A getOutputData response body as ReturnOutputData.
+
+    A missing or unparseable reading is None; see ReturnOutputData. batS is
+    0 instead, which the status sensor already shows as "Unknown (0)".
+    """
+    data = response.get("data") or {}
+    return ReturnOutputData(
+        # batS is on root level, not inside data!
+        _as_int(response.get("batS")),
+        *(parse(data.get(name)) for name, parse in _OUTPUT_FIELDS),
+    )
+
+
+def parse_alarm_data(data: dict) -> ReturnAlarmData:
+    """The "data" object of a getAlarm response as ReturnAlarmData.
+
+    A missing field is 0 for the seventeen every firmware sends, and None for
+    the three newer ones -- absent there means "not reported", not "clear".
+    Anything else that is not a number is 0: guessing "raised" would be a
+    false problem report.
+    """
+    fields = {}
+    for name in ReturnAlarmData.__dataclass_fields__:
+        raw = data.get(name)
+        if name in _OPTIONAL_ALARM_FIELDS and (raw is None or raw == ""):
+            fields[name] = None
+        else:
+            fields[name] = _as_int(raw)
+    return ReturnAlarmData(**fields)
 
 
 class APsystemsEZHI:
     """API client for APSystems EZHI Inverter."""
 
-    def __init__(self, ip_address: str, timeout: int = 10):
-        """Initialize the APsystems EZHI API client."""
+    def __init__(
+        self,
+        ip_address: str,
+        session: aiohttp.ClientSession,
+        timeout: int = 10,
+    ):
+        """Initialize the APsystems EZHI API client.
+
+        The session is the caller's, not ours: inside Home Assistant that is
+        the shared one from async_get_clientsession, which keeps the inverter
+        connection alive between polls and is closed by Home Assistant itself.
+        A session this class opened lazily was never closed, and leaked one
+        connector per reload.
+        """
         self.ip_address = ip_address
         self.timeout = timeout
-        self.session = None
+        self.session = session
+        # Both are fixed for the life of the client and _request runs on every
+        # poll, so they are built once here rather than once per request.
+        self._base_url = f"http://{ip_address}/"
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
 
     async def _request(self, endpoint: str, params: Optional[dict[str, Any]] = None) -> dict:
-        """Make a request to the API."""
-        if self.session is None:
-            self.session = aiohttp.ClientSession()
-            
-        url = f"http://{self.ip_address}/{endpoint}"
+        """Make a request to the API.
+
+        Raises aiohttp.ClientError or asyncio.TimeoutError when the inverter
+        cannot be reached, and ValueError when it answers with something that
+        is not a JSON object -- those three and nothing else, so the caller
+        can name them instead of catching Exception.
+        """
+        async with self.session.get(
+            self._base_url + endpoint, params=params, timeout=self._timeout
+        ) as response:
+            response.raise_for_status()
+            # orjson rather than aiohttp's default stdlib json: Home
+            # Assistant already ships it, and this runs on every poll.
+            # Its JSONDecodeError is a ValueError already.
+            body = await response.json(loads=orjson.loads)
+        if not isinstance(body, dict):
+            # Every parser here starts with body.get(...); a list or a bare
+            # string would otherwise surface as an AttributeError from there.
+            raise ValueError(f"expected a JSON object, got {type(body).__name__}")
+        return body
+
+    async def _request_or_none(
+        self, endpoint: str, params: Optional[dict[str, Any]] = None
+    ) -> dict | None:
+        """_request, with the inverter being unreachable answered by None.
+
+        An inverter on flaky Wi-Fi drops out for minutes at a time. Raising
+        for that on every 5 s poll meant an exception unwinding through the
+        coordinator and an error line per request; the coordinator already
+        says once that the device went away and once that it came back. A
+        garbled answer -- a reply cut short when the Wi-Fi drops mid-body --
+        is the same outage seen from the other side, and is None as well.
+        Anything else is a bug, and still raises.
+        """
         try:
-            async with asyncio.timeout(self.timeout):
-                response = await self.session.get(url, params=params)
-                response.raise_for_status()
-                return await response.json()
-        except (aiohttp.ClientError, asyncio.TimeoutError) as error:
-            _LOGGER.error("Error requesting data from %s: %s", url, error)
-            raise
-
-    async def get_device_info(self) -> ReturnDeviceInfo:
-        """Get device information of EZHI."""
-        response = await self._request("getDeviceInfo")
-        data = response.get("data", {})
+            return await self._request(endpoint, params)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as error:
+            _LOGGER.debug("Error requesting %s%s: %s", self._base_url, endpoint, error)
+            return None
+
+    async def get_device_info(self) -> ReturnDeviceInfo | None:
+        """Get device information of EZHI, or None if it did not answer."""
+        if (response := await self._request_or_none("getDeviceInfo")) is None:
+            return None
+        data = response.get("data") or {}
         return ReturnDeviceInfo(
             deviceId=data.get("deviceId", ""),
             type=data.get("type", ""),
@@ -136,61 +275,23 @@ class APsystemsEZHI:
             ip=data.get("ip", "")
         )
 
-    async def get_output_data(self) -> ReturnOutputData:
-        """Get current output data of EZHI."""
-        response = await self._request("getOutputData")
-        data = response.get("data", {})
-        return ReturnOutputData(
-            # batS is on root level, not inside data!
-            batS=response.get("batS", "0"),
-            batSoc=data.get("batSoc", "0"),
-            batSoh=data.get("batSoh", "0"),
-            batTemp=data.get("batTemp", "0"),
-            devTemp=data.get("devTemp", "0"),
-            pvP=data.get("pvP", "0"),
-            pvTE=data.get("pvTE", "0"),
-            batP=data.get("batP", "0"),
-            batCTE=data.get("batCTE", "0"),
-            batDTE=data.get("batDTE", "0"),
-            ogP=data.get("ogP", "0"),
-            ogOTE=data.get("ogOTE", "0"),
-            ogITE=data.get("ogITE", "0"),
-            ofgP=data.get("ofgP", "0"),
-            ofgOTE=data.get("ofgOTE", "0"),
-            ofgITE=data.get("ofgITE", "0"),
-        )
+    async def get_output_data(self) -> ReturnOutputData | None:
+        """Get current output data of EZHI, or None if it did not answer."""
+        if (response := await self._request_or_none("getOutputData")) is None:
+            return None
+        return parse_output_data(response)
 
-    async def get_alarm(self) -> ReturnAlarmData:
-        """Get alarm information of EZHI."""
-        response = await self._request("getAlarm")
-        data = response.get("data", {})
-        return ReturnAlarmData(
-            BatHTP=data.get("BatHTP", "0"),
-            BatLTP=data.get("BatLTP", "0"),
-            BatCE=data.get("BatCE", "0"),
-            BatHV=data.get("BatHV", "0"),
-            BatLV=data.get("BatLV", "0"),
-            BatHI=data.get("BatHI", "0"),
-            BatE=data.get("BatE", "0"),
-            DTP=data.get("DTP", "0"),
-            EE=data.get("EE", "0"),
-            SBS=data.get("SBS", "0"),
-            ACA=data.get("ACA", "0"),
-            OfOI=data.get("OfOI", "0"),
-            PvHV=data.get("PvHV", "0"),
-            PvOC=data.get("PvOC", "0"),
-            IRDE=data.get("IRDE", "0"),
-            PVWE=data.get("PVWE", "0"),
-            OfGS=data.get("OfGS", "0"),
-            BCC=data.get("BCC", ""),
-            BCI=data.get("BCI", ""),
-            VRP=data.get("VRP", ""),
-        )
+    async def get_alarm(self) -> ReturnAlarmData | None:
+        """Get alarm information of EZHI, or None if it did not answer."""
+        if (response := await self._request_or_none("getAlarm")) is None:
+            return None
+        return parse_alarm_data(response.get("data") or {})
 
-    async def get_power(self) -> int:
-        """Get on-grid power setting value of EZHI."""
-        response = await self._request("getPower")
-        power_str = response.get("data", {}).get("power", "0")
+    async def get_power(self) -> int | None:
+        """Get on-grid power setting value of EZHI, or None if it did not answer."""
+        if (response := await self._request_or_none("getPower")) is None:
+            return None
+        power_str = (response.get("data") or {}).get("power", "0")
         try:
             # Convert to float first, then to int
             return int(float(power_str))
@@ -199,8 +300,18 @@ class APsystemsEZHI:
 
     async def set_power(self, power: int) -> bool:
         """Set on-grid power setting value of EZHI."""
-        try:
-            response = await self._request("setPower", params={"p": power})
-            return response.get("message") == "SUCCESS"
-        except (aiohttp.ClientError, asyncio.TimeoutError):
+        response = await self._request_or_none("setPower", params={"p": power})
+        if response is None:
+            # A write is rare and someone is waiting on it, so unlike a failed
+            # poll this one is worth an error line of its own.
+            _LOGGER.error("Could not reach the inverter to set %s W", power)
+            return False
+        # Neither caller checks the result, so a refusal is reported here,
+        # next to the unreachable case, rather than lost.
+        message = response.get("message")
+        if message != "SUCCESS":
+            _LOGGER.warning(
+                "The inverter did not accept %s W: %s", power, message
+            )
             return False
+        return True
@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Callable
+from operator import attrgetter
 
 from homeassistant import config_entries
 from homeassistant.components.binary_sensor import (
@@ -11,14 +11,13 @@ from homeassistant.components.binary_sensor import (
     BinarySensorEntityDescription,
 )
 from homeassistant.const import CONF_NAME
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from . import ApSystemsDataCoordinator
 from .alarm_texts import alarm_text
-from .api import ReturnAlarmData
 from .const import DOMAIN
 
 
@@ -27,169 +26,61 @@ class EZHIBinarySensorEntityDescription(BinarySensorEntityDescription):
     """Describes EZHI binary sensor entity."""
     
     # The getAlarm field this sensor reads, which is also the key into
-    # ALARM_TEXTS. Carried explicitly rather than parsed back out of value_fn.
+    # ALARM_TEXTS. ReturnAlarmData's fields carry the same names, so this is
+    # all the entity needs to find its value -- no per-sensor function.
     alarm_code: str
 
-    # bool | None, not bool: the three newest alarm fields are absent on
-    # older firmware, and "we don't know" is not the same answer as "no".
-    value_fn: Callable[[ReturnAlarmData], bool | None]
 
-
-def _alarm_flag(raw) -> bool | None:
+def _alarm_flag(value: int | None) -> bool | None:
     """One alarm field to on/off, or None when the firmware did not report it.
 
-    The older sensors in this file compare to "1" directly and so read a
-    missing field as "off". For a field that may genuinely be absent, that
-    would assert the absence of a fault the device never denied.
+    Every sensor here goes through this. For the seventeen fields all
+    firmware sends it is a plain == 1 (api.py parses a missing one as 0). For
+    the three that may genuinely be absent, "off" would assert the absence of
+    a fault the device never denied -- api.py leaves those None, and so does
+    this.
     """
-    if raw is None or str(raw) == "":
+    if value is None:
         return None
-    return str(raw) == "1"
-
-
-ALARM_SENSORS: tuple[EZHIBinarySensorEntityDescription, ...] = (
-    EZHIBinarySensorEntityDescription(
-        key="battery_overtemp",
-        name="Battery Overtemperature",
-        device_class=BinarySensorDeviceClass.PROBLEM,
-        alarm_code="BatHTP",
-        value_fn=lambda data: str(data.BatHTP) == "1",
-    ),
-    EZHIBinarySensorEntityDescription(
-        key="battery_undertemp",
-        name="Battery Undertemperature",
-        device_class=BinarySensorDeviceClass.PROBLEM,
-        alarm_code="BatLTP",
-        value_fn=lambda data: str(data.BatLTP) == "1",
-    ),
-    EZHIBinarySensorEntityDescription(
-        key="battery_comm_error",
-        name="Battery Communication Error",
-        device_class=BinarySensorDeviceClass.PROBLEM,
-        alarm_code="BatCE",
-        value_fn=lambda data: str(data.BatCE) == "1",
-    ),
-    EZHIBinarySensorEntityDescription(
-        key="battery_overvoltage",
-        name="Battery Overvoltage",
-        device_class=BinarySensorDeviceClass.PROBLEM,
-        alarm_code="BatHV",
-        value_fn=lambda data: str(data.BatHV) == "1",
-    ),
-    EZHIBinarySensorEntityDescription(
-        key="battery_undervoltage",
-        name="Battery Undervoltage",
-        device_class=BinarySensorDeviceClass.PROBLEM,
-        alarm_code="BatLV",
-        value_fn=lambda data: str(data.BatLV) == "1",
-    ),
-    EZHIBinarySensorEntityDescription(
-        key="battery_overcurrent",
-        name="Battery Overcurrent",
-        device_class=BinarySensorDeviceClass.PROBLEM,
-        alarm_code="BatHI",
-        value_fn=lambda data: str(data.BatHI) == "1",
-    ),
-    EZHIBinarySensorEntityDescription(
-        key="battery_error",
-        name="Battery Error",
-        device_class=BinarySensorDeviceClass.PROBLEM,
-        alarm_code="BatE",
-        value_fn=lambda data: str(data.BatE) == "1",
-    ),
-    EZHIBinarySensorEntityDescription(
-        key="battery_shutdown",
-        name="Battery Shutdown",
-        device_class=BinarySensorDeviceClass.PROBLEM,
-        alarm_code="SBS",
-        value_fn=lambda data: str(data.SBS) == "1",
-    ),
-    EZHIBinarySensorEntityDescription(
-        key="device_overtemp",
-        name="Device Overtemperature",
-        device_class=BinarySensorDeviceClass.PROBLEM,
-        alarm_code="DTP",
-        value_fn=lambda data: str(data.DTP) == "1",
-    ),
-    EZHIBinarySensorEntityDescription(
-        key="device_error",
-        name="Device Error",
-        device_class=BinarySensorDeviceClass.PROBLEM,
-        alarm_code="EE",
-        value_fn=lambda data: str(data.EE) == "1",
-    ),
-    EZHIBinarySensorEntityDescription(
-        key="ac_abnormal",
-        name="AC Abnormal",
-        device_class=BinarySensorDeviceClass.PROBLEM,
-        alarm_code="ACA",
-        value_fn=lambda data: str(data.ACA) == "1",
-    ),
-    EZHIBinarySensorEntityDescription(
-        key="offgrid_overcurrent",
-        name="Off-Grid Overcurrent",
-        device_class=BinarySensorDeviceClass.PROBLEM,
-        alarm_code="OfOI",
-        value_fn=lambda data: str(data.OfOI) == "1",
-    ),
-    EZHIBinarySensorEntityDescription(
-        key="offgrid_short",
-        name="Off-Grid Short Circuit",
-        device_class=BinarySensorDeviceClass.PROBLEM,
-        alarm_code="OfGS",
-        value_fn=lambda data: str(data.OfGS) == "1",
-    ),
-    EZHIBinarySensorEntityDescription(
-        key="pv_overvoltage",
-        name="PV Overvoltage",
-        device_class=BinarySensorDeviceClass.PROBLEM,
-        alarm_code="PvHV",
-        value_fn=lambda data: str(data.PvHV) == "1",
-    ),
-    EZHIBinarySensorEntityDescription(
-        key="pv_overcurrent",
-        name="PV Overcurrent",
-        device_class=BinarySensorDeviceClass.PROBLEM,
-        alarm_code="PvOC",
-        value_fn=lambda data: str(data.PvOC) == "1",
-    ),
-    EZHIBinarySensorEntityDescription(
-        key="pv_wiring_error",
-        name="PV Wiring Error",
-        device_class=BinarySensorDeviceClass.PROBLEM,
-        alarm_code="PVWE",
-        value_fn=lambda data: str(data.PVWE) == "1",
-    ),
-    EZHIBinarySensorEntityDescription(
-        key="ird_error",
-        name="IRD Error",
-        device_class=BinarySensorDeviceClass.PROBLEM,
-        alarm_code="IRDE",
-        value_fn=lambda data: str(data.IRDE) == "1",
-    ),
+    return value == 1
+
+
+# (key, name, getAlarm field). Every alarm is a PROBLEM sensor and differs
+# from the others only in these three, so they are a table rather than twenty
+# spelled-out descriptions.
+_ALARM_SPECS: tuple[tuple[str, str, str], ...] = (
+    ("battery_overtemp", "Battery Overtemperature", "BatHTP"),
+    ("battery_undertemp", "Battery Undertemperature", "BatLTP"),
+    ("battery_comm_error", "Battery Communication Error", "BatCE"),
+    ("battery_overvoltage", "Battery Overvoltage", "BatHV"),
+    ("battery_undervoltage", "Battery Undervoltage", "BatLV"),
+    ("battery_overcurrent", "Battery Overcurrent", "BatHI"),
+    ("battery_error", "Battery Error", "BatE"),
+    ("battery_shutdown", "Battery Shutdown", "SBS"),
+    ("device_overtemp", "Device Overtemperature", "DTP"),
+    ("device_error", "Device Error", "EE"),
+    ("ac_abnormal", "AC Abnormal", "ACA"),
+    ("offgrid_overcurrent", "Off-Grid Overcurrent", "OfOI"),
+    ("offgrid_short", "Off-Grid Short Circuit", "OfGS"),
+    ("pv_overvoltage", "PV Overvoltage", "PvHV"),
+    ("pv_overcurrent", "PV Overcurrent", "PvOC"),
+    ("pv_wiring_error", "PV Wiring Error", "PVWE"),
+    ("ird_error", "IRD Error", "IRDE"),
     # The three fields getAlarm reports but the integration never mapped.
     # Names and meanings are the vendor app's own, not invented here.
+    ("soc_calibration", "SOC Calibration Needed", "BCC"),
+    ("battery_access_conflict", "Battery Access Conflict", "BCI"),
+    ("voltage_reset_protection", "Voltage Reset Protection", "VRP"),
+)
+
+ALARM_SENSORS: tuple[EZHIBinarySensorEntityDescription, ...] = tuple(
     EZHIBinarySensorEntityDescription(
-        key="soc_calibration",
-        name="SOC Calibration Needed",
-        device_class=BinarySensorDeviceClass.PROBLEM,
-        alarm_code="BCC",
-        value_fn=lambda data: _alarm_flag(data.BCC),
-    ),
-    EZHIBinarySensorEntityDescription(
-        key="battery_access_conflict",
-        name="Battery Access Conflict",
-        device_class=BinarySensorDeviceClass.PROBLEM,
-        alarm_code="BCI",
-        value_fn=lambda data: _alarm_flag(data.BCI),
-    ),
-    EZHIBinarySensorEntityDescription(
-        key="voltage_reset_protection",
-        name="Voltage Reset Protection",
+        key=key,
+        name=name,
         device_class=BinarySensorDeviceClass.PROBLEM,
-        alarm_code="VRP",
-        value_fn=lambda data: _alarm_flag(data.VRP),
-    ),
+        alarm_code=alarm_code,
+    )
+    for key, name, alarm_code in _ALARM_SPECS
 )
 
 
@@ -237,18 +128,46 @@ class EZHIAlarmBinarySensor(CoordinatorEntity, BinarySensorEntity):
         """Initialize the binary sensor."""
         super().__init__(coordinator)
         self.entity_description = description
-        self._device_name = device_name
         self._attr_unique_id = f"apsystems_{device_name}_{description.key}"
+        # Static on purpose. Firmware version, serial and URL are written to
+        # the device registry by the coordinator when they change, instead
+        # of being rebuilt into a fresh DeviceInfo on every lookup.
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, device_name)},
+            name=device_name,
+            manufacturer="APsystems",
+            model="EZHI",
+        )
+        self._read_alarm = attrgetter(description.alarm_code)
+        self._last_written: tuple[bool | None, bool] | None = None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when this sensor's own answer changed.
+
+        The coordinator wakes every entity whenever any reading or alarm
+        changed, and power moves nearly every poll while an alarm stays clear
+        for days. Home Assistant would drop the unchanged write itself; what
+        this saves is building the state and making the call, for each of the
+        alarm sensors. Availability is part of the comparison: going
+        unavailable with the same is_on is still a change worth showing.
+        """
+        state = (self.is_on, self.available)
+        if state != self._last_written:
+            self._last_written = state
+            self.async_write_ha_state()
 
     @property
     def is_on(self) -> bool | None:
-        """Return true if the binary sensor is on."""
-        if self.coordinator.alarm_data is None:
-            return None
-        try:
-            return self.entity_description.value_fn(self.coordinator.alarm_data)
-        except (AttributeError, TypeError):
+        """Return true if the binary sensor is on.
+
+        bool | None, not bool: the three newest alarm fields are absent on
+        older firmware, and "we don't know" is not the same answer as "no".
+        """
+        data = self.coordinator.alarm_data
+        if data is None:
             return None
+        return _alarm_flag(self._read_alarm(data))
 
     @property
     def extra_state_attributes(self) -> dict[str, str]:
@@ -269,25 +188,3 @@ class EZHIAlarmBinarySensor(CoordinatorEntity, BinarySensorEntity):
         if text.get("suggest"):
             attrs["suggested_action"] = text["suggest"]
         return attrs
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return device information."""
-        info = DeviceInfo(
-            identifiers={(DOMAIN, self._device_name)},
-            name=self._device_name,
-            manufacturer="APsystems",
-            model="EZHI",
-        )
-        
-        # Add dynamic info from coordinator if available
-        if self.coordinator.device_info is not None:
-            dev = self.coordinator.device_info
-            if dev.devVer:
-                info["sw_version"] = dev.devVer
-            if dev.deviceId:
-                info["serial_number"] = dev.deviceId
-            if dev.ip:
-                info["configuration_url"] = f"http://{dev.ip}/getDeviceInfo"
-        
-        return info
@@ -3,7 +3,6 @@ import asyncio
 from collections.abc import Mapping
 from typing import Any
 
-from aiohttp import client_exceptions
 import voluptuous as vol
 
 from homeassistant import config_entries
@@ -36,6 +35,17 @@ from .api import APsystemsEZHI
 from .cloud import EzhiCloudApi, EzhiCloudAuthError, EzhiCloudError, async_login
 
 
+def _alarm_interval_too_short(user_input: dict[str, Any]) -> bool:
+    """Whether the alarm interval is shorter than the output interval.
+
+    getAlarm rides on the output poll, so it cannot come round more often
+    than that poll does; a shorter value would silently be rounded up.
+    """
+    return user_input.get(
+        SCAN_INTERVAL_ALARM, DEFAULT_SCAN_INTERVAL_ALARM
+    ) < user_input.get(SCAN_INTERVAL_OUTPUT, DEFAULT_SCAN_INTERVAL_OUTPUT)
+
+
 class APsystemsEZHILocalAPIFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Config flow for APsystems EZHI Local API."""
 
@@ -55,14 +65,19 @@ class APsystemsEZHILocalAPIFlow(config_entries.ConfigFlow, domain=DOMAIN):
         _errors = {}
 
         if user_input is not None:
-            try:
-                if user_input.get("check", True):
-                    api = APsystemsEZHI(user_input[CONF_IP_ADDRESS])
-                    await api.get_device_info()
-            except (client_exceptions.ClientConnectionError, asyncio.TimeoutError) as exception:
-                LOGGER.warning(exception)
-                _errors["base"] = "connection_refused"
-            else:
+            if _alarm_interval_too_short(user_input):
+                _errors[SCAN_INTERVAL_ALARM] = "alarm_interval_too_short"
+            elif user_input.get("check", True):
+                api = APsystemsEZHI(
+                    user_input[CONF_IP_ADDRESS],
+                    session=async_get_clientsession(self.hass),
+                )
+                if await api.get_device_info() is None:
+                    LOGGER.warning(
+                        "No answer from an EZHI at %s", user_input[CONF_IP_ADDRESS]
+                    )
+                    _errors["base"] = "connection_refused"
+            if not _errors:
                 return self.async_create_entry(
                     title=user_input[CONF_NAME],
                     data=user_input,
@@ -218,6 +233,8 @@ class APsystemsEZHIOptionsFlow(config_entries.OptionsFlow):
                 # Half a credential pair is a typo, not an intent to clear the
                 # cloud layer -- clearing is done by emptying the token fields.
                 errors["base"] = "incomplete_credentials"
+            if _alarm_interval_too_short(user_input):
+                errors[SCAN_INTERVAL_ALARM] = "alarm_interval_too_short"
 
             if errors:
                 return self.async_show_form(
@@ -74,15 +74,12 @@ class EzhiCloudEntity(CoordinatorEntity):
         name_suffix: str,
     ) -> None:
         super().__init__(coordinator)
-        self._device_name = device_name
         self._attr_name = name_suffix
         self._attr_unique_id = f"apsystems_{device_name}_cloud_{unique_id_suffix}"
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        return DeviceInfo(
-            identifiers={(DOMAIN, self._device_name)},
-            name=self._device_name,
+        # Nothing in here changes, so it is built once rather than per lookup.
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, device_name)},
+            name=device_name,
             manufacturer="APsystems",
             model="EZHI",
         )
@@ -4,22 +4,21 @@ from __future__ import annotations
 import asyncio
 from dataclasses import dataclass
 
-from aiohttp import client_exceptions
-
 from homeassistant import config_entries
 from homeassistant.components.number import (
     NumberDeviceClass,
     NumberEntity,
     NumberMode,
 )
-from homeassistant.const import CONF_IP_ADDRESS, CONF_NAME, PERCENTAGE, UnitOfPower
-from homeassistant.core import HomeAssistant
+from homeassistant.const import CONF_NAME, PERCENTAGE, UnitOfPower
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
+from . import ApSystemsDataCoordinator
 from .const import CLOUD_COORDINATOR, DOMAIN, LOGGER, MAX_VALUE, MIN_VALUE
-from .api import APsystemsEZHI
 from .cloud import EzhiCloudError
 from .entity import (
     CLOUD_WRITE_TIMEOUT_S,
@@ -35,17 +34,15 @@ async def async_setup_entry(
 ) -> None:
     """Set up the number platform."""
     config = hass.data[DOMAIN][config_entry.entry_id]
-    api = APsystemsEZHI(ip_address=config[CONF_IP_ADDRESS])
 
-    # update_before_add=True: PowerLimit is a plain, should_poll=True
-    # NumberEntity and would otherwise sit at `unknown` until its first poll.
-    # `config` rather than the coordinator itself: the cloud side is optional
-    # and PowerLimit only reads the mode at write time, so it must not capture
-    # a None that was true at setup.
+    # `config` rather than the cloud coordinator itself: the cloud side is
+    # optional and PowerLimit only reads the mode at write time, so it must
+    # not capture a None that was true at setup.
     add_entities([
-        PowerLimit(api, device_name=config[CONF_NAME], sensor_name="On-Grid Power",
-                   sensor_id="max_output_power", entry_data=config),
-    ], True)
+        PowerLimit(config["COORDINATOR"], device_name=config[CONF_NAME],
+                   sensor_name="On-Grid Power", sensor_id="max_output_power",
+                   entry_data=config),
+    ])
 
     cloud_coordinator = config.get(CLOUD_COORDINATOR)
     if cloud_coordinator is not None:
@@ -63,10 +60,14 @@ async def async_setup_entry(
         ])
 
 
-class PowerLimit(NumberEntity):
-    """Representation of a power limit control."""
+class PowerLimit(CoordinatorEntity, NumberEntity):
+    """Representation of a power limit control.
+
+    Reads the setpoint the local coordinator keeps rather than polling
+    getPower itself: it used to own a second APsystemsEZHI and ask the
+    inverter every 30 s, on top of the coordinator's own requests.
+    """
     _attr_device_class = NumberDeviceClass.POWER
-    _attr_available = False
     _attr_native_min_value = MIN_VALUE
     _attr_native_max_value = MAX_VALUE
     _attr_native_step = 10
@@ -74,33 +75,44 @@ class PowerLimit(NumberEntity):
     # entity carries only its own half of the name.
     _attr_has_entity_name = True
 
-    def __init__(self, api: APsystemsEZHI, device_name: str, sensor_name: str,
-                 sensor_id: str, entry_data: dict | None = None):
+    def __init__(self, coordinator: ApSystemsDataCoordinator, device_name: str,
+                 sensor_name: str, sensor_id: str, entry_data: dict | None = None):
         """Initialize the sensor."""
-        self._api = api
-        self._state = None
-        self._device_name = device_name
+        super().__init__(coordinator)
         self._attr_name = sensor_name
-        self._sensor_id = sensor_id
+        self._attr_unique_id = f"apsystems_{device_name}_{sensor_id}"
+        # Static, as in binary_sensor.py: the coordinator keeps the registry's
+        # firmware, serial and URL up to date.
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, device_name)},
+            name=device_name,
+            manufacturer="APsystems",
+            model="EZHI",
+        )
         self._entry_data = entry_data or {}
+        self._last_written: tuple[int | None, bool] | None = None
 
-    async def async_update(self):
-        """Update the entity."""
-        try:
-            self._state = await self._api.get_power()
-            self._attr_available = True
-        except (TimeoutError, client_exceptions.ClientConnectionError):
-            self._attr_available = False
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when the setpoint or availability changed.
+
+        The coordinator wakes its listeners whenever the output readings do,
+        which is most polls; the setpoint itself changes a few times a day.
+        """
+        state = (self.native_value, self.available)
+        if state != self._last_written:
+            self._last_written = state
+            self.async_write_ha_state()
 
     @property
-    def state(self):
-        """Return the state of the sensor."""
-        return self._state
+    def available(self) -> bool:
+        """Unavailable until getPower has answered at least once."""
+        return super().available and self.coordinator.power_limit is not None
 
     @property
-    def unique_id(self) -> str | None:
-        """Return the unique ID of the sensor."""
-        return f"apsystems_{self._device_name}_{self._sensor_id}"
+    def native_value(self) -> int | None:
+        """Return the on-grid power setpoint in W."""
+        return self.coordinator.power_limit
 
     async def async_set_native_value(self, value: float) -> None:
         """Set the value of the power limit."""
@@ -114,24 +126,8 @@ class PowerLimit(NumberEntity):
                 "Local mode acts on the local setpoint. See the README.",
                 int(value), mode,
             )
-        try:
-            await self._api.set_power(int(value))
-            self._attr_available = True
-        except (TimeoutError, client_exceptions.ClientConnectionError):
-            self._attr_available = False
-        await self.async_update()
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return device information."""
-        return DeviceInfo(
-            identifiers={
-                (DOMAIN, self._device_name)
-            },
-            name=self._device_name,
-            manufacturer="APsystems",
-            model="EZHI",
-        )
+        await self.coordinator.api.set_power(int(value))
+        await self.coordinator.async_refresh_power_limit()
 
 
 _KEY_TO_KWARG = {"socMin": "soc_min", "socMax": "soc_max"}
@@ -1,171 +1,125 @@
 """Sensor platform for APsystems EZHI local API integration."""
 from __future__ import annotations
 
-import voluptuous as vol
+from abc import abstractmethod
+from dataclasses import dataclass
+from operator import attrgetter
 
 from homeassistant import config_entries
 from homeassistant.components.sensor import (
-    PLATFORM_SCHEMA,
     SensorDeviceClass,
     SensorEntity,
+    SensorEntityDescription,
     SensorStateClass,
 )
-from homeassistant.const import CONF_IP_ADDRESS, CONF_NAME, UnitOfEnergy, UnitOfPower, PERCENTAGE, UnitOfTemperature
+from homeassistant.const import CONF_NAME, UnitOfEnergy, UnitOfPower, PERCENTAGE, UnitOfTemperature
 from homeassistant.core import HomeAssistant, callback
-import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.typing import DiscoveryInfoType
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from . import ApSystemsDataCoordinator
 from .const import CLOUD_COORDINATOR, DOMAIN
 from .cloud import HIGH_POWER_LIMIT, STANDARD_POWER_LIMIT
 from .entity import EzhiCloudEntity
-from .api import ReturnDeviceInfo
-
-PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend(
-    {
-        vol.Required(CONF_IP_ADDRESS): cv.string,
-        vol.Optional(CONF_NAME, default="ezhi"): cv.string,
-    }
-)
+from .api import ReturnOutputData
 
 
-# Battery status mapping (per API documentation)
+# Battery status mapping (per API documentation). Keyed by int because
+# api.py already parses batS to one, whether the device sent "2" or 2.
 BATTERY_STATUS_MAP = {
-    "1": "Idle",
-    "2": "Charging",
-    "3": "Discharging",
-    "4": "Fault",
-    "5": "Shutdown",
-    "6": "No Communication",
+    1: "Idle",
+    2: "Charging",
+    3: "Discharging",
+    4: "Fault",
+    5: "Shutdown",
+    6: "No Communication",
 }
 
 
+@dataclass(frozen=True, kw_only=True)
+class EZHISensorEntityDescription(SensorEntityDescription):
+    """Describes an EZHI sensor that shows one getOutputData field as is."""
+
+    # The ReturnOutputData field to show. api.py has already parsed it to a
+    # number, so there is nothing left to convert per sensor.
+    field: str
+
+
+# (key, name, ReturnOutputData field, unit, device class, state class). The
+# plain readings differ only in these, so they are a table rather than one
+# class each repeating the same update method.
+_METRIC_SPECS: tuple[tuple[str, str, str, str, SensorDeviceClass | None, SensorStateClass], ...] = (
+    ("photovoltaic_power", "Photovoltaic Power", "pvP",
+     UnitOfPower.WATT, SensorDeviceClass.POWER, SensorStateClass.MEASUREMENT),
+    ("photovoltaic_energy", "Photovoltaic Energy", "pvTE",
+     UnitOfEnergy.KILO_WATT_HOUR, SensorDeviceClass.ENERGY, SensorStateClass.TOTAL),
+    ("battery_power", "Battery Power", "batP",
+     UnitOfPower.WATT, SensorDeviceClass.POWER, SensorStateClass.MEASUREMENT),
+    ("battery_soc", "Battery State of Charge", "batSoc",
+     PERCENTAGE, SensorDeviceClass.BATTERY, SensorStateClass.MEASUREMENT),
+    ("battery_soh", "Battery State of Health", "batSoh",
+     PERCENTAGE, None, SensorStateClass.MEASUREMENT),
+    ("battery_temperature", "Battery Temperature", "batTemp",
+     UnitOfTemperature.CELSIUS, SensorDeviceClass.TEMPERATURE, SensorStateClass.MEASUREMENT),
+    ("battery_charge_energy", "Battery Total Charge Energy", "batCTE",
+     UnitOfEnergy.KILO_WATT_HOUR, SensorDeviceClass.ENERGY, SensorStateClass.TOTAL),
+    ("battery_discharge_energy", "Battery Total Discharge Energy", "batDTE",
+     UnitOfEnergy.KILO_WATT_HOUR, SensorDeviceClass.ENERGY, SensorStateClass.TOTAL),
+    ("ongrid_power", "On-Grid Power", "ogP",
+     UnitOfPower.WATT, SensorDeviceClass.POWER, SensorStateClass.MEASUREMENT),
+    ("ongrid_output_energy", "On-Grid Output Energy", "ogOTE",
+     UnitOfEnergy.KILO_WATT_HOUR, SensorDeviceClass.ENERGY, SensorStateClass.TOTAL),
+    ("ongrid_input_energy", "On-Grid Input Energy", "ogITE",
+     UnitOfEnergy.KILO_WATT_HOUR, SensorDeviceClass.ENERGY, SensorStateClass.TOTAL),
+    ("offgrid_power", "Off-Grid Power", "ofgP",
+     UnitOfPower.WATT, SensorDeviceClass.POWER, SensorStateClass.MEASUREMENT),
+    ("offgrid_output_energy", "Off-Grid Output Energy", "ofgOTE",
+     UnitOfEnergy.KILO_WATT_HOUR, SensorDeviceClass.ENERGY, SensorStateClass.TOTAL),
+    ("offgrid_input_energy", "Off-Grid Input Energy", "ofgITE",
+     UnitOfEnergy.KILO_WATT_HOUR, SensorDeviceClass.ENERGY, SensorStateClass.TOTAL),
+    ("device_temperature", "Device Temperature", "devTemp",
+     UnitOfTemperature.CELSIUS, SensorDeviceClass.TEMPERATURE, SensorStateClass.MEASUREMENT),
+)
+
+METRIC_SENSORS: tuple[EZHISensorEntityDescription, ...] = tuple(
+    EZHISensorEntityDescription(
+        key=key,
+        name=name,
+        field=field,
+        native_unit_of_measurement=unit,
+        device_class=device_class,
+        state_class=state_class,
+    )
+    for key, name, field, unit, device_class, state_class in _METRIC_SPECS
+)
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: config_entries.ConfigEntry,
     add_entities: AddEntitiesCallback,
-    discovery_info: DiscoveryInfoType | None = None,
 ) -> None:
     """Set up the sensor platform."""
     config = hass.data[DOMAIN][config_entry.entry_id]
     coordinator = config["COORDINATOR"]
 
     sensors = [
-        # Battery Status Sensor (NEW)
         BatteryStatusSensor(
             coordinator,
             device_name=config[CONF_NAME],
             sensor_name="Battery Status",
             sensor_id="battery_status",
         ),
-        
-        # PV Sensors
-        PhotovoltaicPowerSensor(
-            coordinator,
-            device_name=config[CONF_NAME],
-            sensor_name="Photovoltaic Power",
-            sensor_id="photovoltaic_power",
-        ),
-        PhotovoltaicEnergySensor(
-            coordinator,
-            device_name=config[CONF_NAME],
-            sensor_name="Photovoltaic Energy",
-            sensor_id="photovoltaic_energy",
-        ),
-        
-        # Battery Sensors
-        BatteryPowerSensor(
-            coordinator,
-            device_name=config[CONF_NAME],
-            sensor_name="Battery Power",
-            sensor_id="battery_power",
-        ),
-        BatteryChargeSensor(
-            coordinator,
-            device_name=config[CONF_NAME],
-            sensor_name="Battery State of Charge",
-            sensor_id="battery_soc",
-        ),
-        BatteryHealthSensor(
-            coordinator,
-            device_name=config[CONF_NAME],
-            sensor_name="Battery State of Health",
-            sensor_id="battery_soh",
-        ),
-        BatteryTemperatureSensor(
-            coordinator,
-            device_name=config[CONF_NAME],
-            sensor_name="Battery Temperature",
-            sensor_id="battery_temperature",
-        ),
-        BatteryChargeEnergySensor(
-            coordinator,
-            device_name=config[CONF_NAME],
-            sensor_name="Battery Total Charge Energy",
-            sensor_id="battery_charge_energy",
-        ),
-        BatteryDischargeEnergySensor(
-            coordinator,
-            device_name=config[CONF_NAME],
-            sensor_name="Battery Total Discharge Energy",
-            sensor_id="battery_discharge_energy",
-        ),
         BatteryCapacitySensor(
             coordinator,
             device_name=config[CONF_NAME],
             sensor_name="Battery Capacity",
             sensor_id="battery_capacity",
         ),
-        
-        # On-Grid Sensors
-        OnGridPowerSensor(
-            coordinator,
-            device_name=config[CONF_NAME],
-            sensor_name="On-Grid Power",
-            sensor_id="ongrid_power",
-        ),
-        OnGridOutputEnergySensor(
-            coordinator,
-            device_name=config[CONF_NAME],
-            sensor_name="On-Grid Output Energy",
-            sensor_id="ongrid_output_energy",
-        ),
-        OnGridInputEnergySensor(
-            coordinator,
-            device_name=config[CONF_NAME],
-            sensor_name="On-Grid Input Energy",
-            sensor_id="ongrid_input_energy",
-        ),
-        
-        # Off-Grid Sensors
-        OffGridPowerSensor(
-            coordinator,
-            device_name=config[CONF_NAME],
-            sensor_name="Off-Grid Power",
-            sensor_id="offgrid_power",
-        ),
-        OffGridOutputEnergySensor(
-            coordinator,
-            device_name=config[CONF_NAME],
-            sensor_name="Off-Grid Output Energy",
-            sensor_id="offgrid_output_energy",
-        ),
-        OffGridInputEnergySensor(
-            coordinator,
-            device_name=config[CONF_NAME],
-            sensor_name="Off-Grid Input Energy",
-            sensor_id="offgrid_input_energy",
-        ),
-        
-        # Device Sensors
-        DeviceTemperatureSensor(
-            coordinator,
-            device_name=config[CONF_NAME],
-            sensor_name="Device Temperature",
-            sensor_id="device_temperature",
+        *(
+            EZHIMetricSensor(coordinator, config[CONF_NAME], description)
+            for description in METRIC_SENSORS
         ),
     ]
 
@@ -237,307 +191,93 @@ class BaseSensor(CoordinatorEntity, SensorEntity):
     ):
         """Initialize the sensor."""
         super().__init__(coordinator)
-        self._state = None
-        self._device_name = device_name
+        # Both fixed for the entity's lifetime: set once here, where the base
+        # class reads them, rather than recomputed in a property per access.
         self._attr_name = sensor_name
-        self._sensor_id = sensor_id
-
-    @property
-    def state(self):
-        """Return the state of the sensor."""
-        return self._state
-
-    @property
-    def unique_id(self) -> str | None:
-        """Return a unique ID for the sensor."""
-        return f"apsystems_{self._device_name}_{self._sensor_id}"
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return device information."""
-        info = DeviceInfo(
-            identifiers={(DOMAIN, self._device_name)},
-            name=self._device_name,
+        self._attr_unique_id = f"apsystems_{device_name}_{sensor_id}"
+        # Static, as in binary_sensor.py: firmware version, serial and URL
+        # reach the device registry through the coordinator, once per change,
+        # instead of through a DeviceInfo rebuilt on every lookup.
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, device_name)},
+            name=device_name,
             manufacturer="APsystems",
             model="EZHI",
         )
-        
-        # Add dynamic info from coordinator if available
-        if self.coordinator.device_info is not None:
-            dev = self.coordinator.device_info
-            if dev.devVer:
-                info["sw_version"] = dev.devVer
-            if dev.deviceId:
-                info["serial_number"] = dev.deviceId
-            if dev.ip:
-                info["configuration_url"] = f"http://{dev.ip}/getDeviceInfo"
-        
-        return info
+        self._last_written: tuple[object, bool] | None = None
 
+    @abstractmethod
+    def _value_from(self, data: ReturnOutputData):
+        """This sensor's value from one poll. The one thing subclasses differ in."""
 
-# NEW: Battery Status Sensor
-class BatteryStatusSensor(BaseSensor):
-    """Representation of a battery status sensor."""
-    
-    @callback
-    def _handle_coordinator_update(self):
-        """Handle updated data from the coordinator."""
-        if self.coordinator.data is not None:
-            # Convert to string to handle both int and string values from API
-            status_code = str(self.coordinator.data.batS)
-            self._state = BATTERY_STATUS_MAP.get(status_code, f"Unknown ({status_code})")
-        self.async_write_ha_state()
-
-
-# PV Sensors
-class PhotovoltaicPowerSensor(BaseSensor):
-    """Representation of a photovoltaic power sensor."""
-    _attr_native_unit_of_measurement = UnitOfPower.WATT
-    _attr_device_class = SensorDeviceClass.POWER
-    _attr_state_class = SensorStateClass.MEASUREMENT
-    
-    @callback
-    def _handle_coordinator_update(self):
-        """Handle updated data from the coordinator."""
-        if self.coordinator.data is not None:
-            try:
-                self._state = float(self.coordinator.data.pvP)
-            except (ValueError, TypeError):
-                self._state = 0
-        self.async_write_ha_state()
-
-
-class PhotovoltaicEnergySensor(BaseSensor):
-    """Representation of a photovoltaic energy sensor."""
-    _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
-    _attr_device_class = SensorDeviceClass.ENERGY
-    _attr_state_class = SensorStateClass.TOTAL
-    
-    @callback
-    def _handle_coordinator_update(self):
-        """Handle updated data from the coordinator."""
-        if self.coordinator.data is not None:
-            self._state = float(self.coordinator.data.pvTE)
-        self.async_write_ha_state()
+    @property
+    def native_value(self):
+        """Read from the coordinator's data, as is_on is for the alarms.
 
+        Not a value stored by the update callback: that never runs when the
+        entity is added, and with always_update=False the next one only comes
+        with a poll that changed something. An idle inverter overnight would
+        have left every sensor unknown until morning.
+        """
+        return self._value_from(self.coordinator.data)
 
-# Battery Sensors
-class BatteryPowerSensor(BaseSensor):
-    """Representation of a battery power sensor."""
-    _attr_native_unit_of_measurement = UnitOfPower.WATT
-    _attr_device_class = SensorDeviceClass.POWER
-    _attr_state_class = SensorStateClass.MEASUREMENT
-    
-    @callback
-    def _handle_coordinator_update(self):
-        """Handle updated data from the coordinator."""
-        if self.coordinator.data is not None:
-            try:
-                self._state = float(self.coordinator.data.batP)
-            except (ValueError, TypeError):
-                self._state = 0
-        self.async_write_ha_state()
-
-
-class BatteryChargeSensor(BaseSensor):
-    """Representation of a battery state of charge sensor."""
-    _attr_native_unit_of_measurement = PERCENTAGE
-    _attr_device_class = SensorDeviceClass.BATTERY
-    _attr_state_class = SensorStateClass.MEASUREMENT
-    
-    @callback
-    def _handle_coordinator_update(self):
-        """Handle updated data from the coordinator."""
-        if self.coordinator.data is not None:
-            try:
-                self._state = int(float(self.coordinator.data.batSoc))
-            except (ValueError, TypeError):
-                self._state = 0
-        self.async_write_ha_state()
-
-
-class BatteryHealthSensor(BaseSensor):
-    """Representation of a battery state of health sensor."""
-    _attr_native_unit_of_measurement = PERCENTAGE
-    _attr_state_class = SensorStateClass.MEASUREMENT
-    
     @callback
-    def _handle_coordinator_update(self):
-        """Handle updated data from the coordinator."""
-        if self.coordinator.data is not None:
-            try:
-                self._state = float(self.coordinator.data.batSoh)
-            except (ValueError, TypeError):
-                self._state = 0
-        self.async_write_ha_state()
-
-
-class BatteryTemperatureSensor(BaseSensor):
-    """Representation of a battery temperature sensor."""
-    _attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
-    _attr_device_class = SensorDeviceClass.TEMPERATURE
-    _attr_state_class = SensorStateClass.MEASUREMENT
-    
-    @callback
-    def _handle_coordinator_update(self):
-        """Handle updated data from the coordinator."""
-        if self.coordinator.data is not None:
-            try:
-                self._state = float(self.coordinator.data.batTemp)
-            except (ValueError, TypeError):
-                self._state = 0
-        self.async_write_ha_state()
-
-
-class BatteryChargeEnergySensor(BaseSensor):
-    """Representation of a battery total charge energy sensor."""
-    _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
-    _attr_device_class = SensorDeviceClass.ENERGY
-    _attr_state_class = SensorStateClass.TOTAL
-    
-    @callback
-    def _handle_coordinator_update(self):
-        """Handle updated data from the coordinator."""
-        if self.coordinator.data is not None:
-            self._state = float(self.coordinator.data.batCTE)
-        self.async_write_ha_state()
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when this sensor's value or availability changed.
 
+        The coordinator wakes every sensor when any reading changed, and
+        battery health or capacity stay put for days while power moves every
+        poll. Same rule as the alarm binary sensors.
+        """
+        state = (self.native_value, self.available)
+        if state != self._last_written:
+            self._last_written = state
+            self.async_write_ha_state()
 
-class BatteryDischargeEnergySensor(BaseSensor):
-    """Representation of a battery total discharge energy sensor."""
-    _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
-    _attr_device_class = SensorDeviceClass.ENERGY
-    _attr_state_class = SensorStateClass.TOTAL
-    
-    @callback
-    def _handle_coordinator_update(self):
-        """Handle updated data from the coordinator."""
-        if self.coordinator.data is not None:
-            self._state = float(self.coordinator.data.batDTE)
-        self.async_write_ha_state()
 
+# NEW: Battery Status Sensor
+class BatteryStatusSensor(BaseSensor):
+    """Representation of a battery status sensor."""
 
-class BatteryCapacitySensor(BaseSensor):
-    """Representation of the battery capacity in kWh."""
-    _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
-    _attr_device_class = SensorDeviceClass.ENERGY
-    _attr_state_class = SensorStateClass.MEASUREMENT
-    
-    @callback
-    def _handle_coordinator_update(self):
-        """Handle updated data from the coordinator."""
-        if self.coordinator.device_info is not None:
-            try:
-                self._state = float(self.coordinator.device_info.batteryCapacity)
-            except (ValueError, TypeError):
-                self._state = 0
-        self.async_write_ha_state()
-
-
-# On-Grid Sensors
-class OnGridPowerSensor(BaseSensor):
-    """Representation of an on-grid power sensor."""
-    _attr_native_unit_of_measurement = UnitOfPower.WATT
-    _attr_device_class = SensorDeviceClass.POWER
-    _attr_state_class = SensorStateClass.MEASUREMENT
-    
-    @callback
-    def _handle_coordinator_update(self):
-        """Handle updated data from the coordinator."""
-        if self.coordinator.data is not None:
-            try:
-                self._state = float(self.coordinator.data.ogP)
-            except (ValueError, TypeError):
-                self._state = 0
-        self.async_write_ha_state()
-
-
-class OnGridOutputEnergySensor(BaseSensor):
-    """Representation of an on-grid output energy sensor."""
-    _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
-    _attr_device_class = SensorDeviceClass.ENERGY
-    _attr_state_class = SensorStateClass.TOTAL
-    
-    @callback
-    def _handle_coordinator_update(self):
-        """Handle updated data from the coordinator."""
-        if self.coordinator.data is not None:
-            self._state = float(self.coordinator.data.ogOTE)
-        self.async_write_ha_state()
-
+    def _value_from(self, data: ReturnOutputData) -> str:
+        return BATTERY_STATUS_MAP.get(data.batS, f"Unknown ({data.batS})")
 
-class OnGridInputEnergySensor(BaseSensor):
-    """Representation of an on-grid input energy sensor."""
-    _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
-    _attr_device_class = SensorDeviceClass.ENERGY
-    _attr_state_class = SensorStateClass.TOTAL
-    
-    @callback
-    def _handle_coordinator_update(self):
-        """Handle updated data from the coordinator."""
-        if self.coordinator.data is not None:
-            self._state = float(self.coordinator.data.ogITE)
-        self.async_write_ha_state()
 
+class EZHIMetricSensor(BaseSensor):
+    """One getOutputData reading, as described by METRIC_SENSORS."""
 
-# Off-Grid Sensors
-class OffGridPowerSensor(BaseSensor):
-    """Representation of an off-grid power sensor."""
-    _attr_native_unit_of_measurement = UnitOfPower.WATT
-    _attr_device_class = SensorDeviceClass.POWER
-    _attr_state_class = SensorStateClass.MEASUREMENT
-    
-    @callback
-    def _handle_coordinator_update(self):
-        """Handle updated data from the coordinator."""
-        if self.coordinator.data is not None:
-            try:
-                self._state = float(self.coordinator.data.ofgP)
-            except (ValueError, TypeError):
-                self._state = 0
-        self.async_write_ha_state()
-
-
-class OffGridOutputEnergySensor(BaseSensor):
-    """Representation of an off-grid output energy sensor."""
-    _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
-    _attr_device_class = SensorDeviceClass.ENERGY
-    _attr_state_class = SensorStateClass.TOTAL
-    
-    @callback
-    def _handle_coordinator_update(self):
-        """Handle updated data from the coordinator."""
-        if self.coordinator.data is not None:
-            self._state = float(self.coordinator.data.ofgOTE)
-        self.async_write_ha_state()
+    entity_description: EZHISensorEntityDescription
 
+    def __init__(
+        self,
+        coordinator: ApSystemsDataCoordinator,
+        device_name: str,
+        description: EZHISensorEntityDescription,
+    ):
+        """Initialize the sensor."""
+        super().__init__(coordinator, device_name, description.name, description.key)
+        self.entity_description = description
+        self._read = attrgetter(description.field)
 
-class OffGridInputEnergySensor(BaseSensor):
-    """Representation of an off-grid input energy sensor."""
-    _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
-    _attr_device_class = SensorDeviceClass.ENERGY
-    _attr_state_class = SensorStateClass.TOTAL
-    
-    @callback
-    def _handle_coordinator_update(self):
-        """Handle updated data from the coordinator."""
-        if self.coordinator.data is not None:
-            self._state = float(self.coordinator.data.ofgITE)
-        self.async_write_ha_state()
+    def _value_from(self, data: ReturnOutputData) -> float | int | None:
+        return self._read(data)
 
 
-class DeviceTemperatureSensor(BaseSensor):
-    """Representation of a device temperature sensor."""
-    _attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
-    _attr_device_class = SensorDeviceClass.TEMPERATURE
+class BatteryCapacitySensor(BaseSensor):
+    """Representation of the battery capacity in kWh."""
+    _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
+    # ENERGY_STORAGE, not ENERGY: that one is for metered totals and rejects
+    # a measurement state class. The check used to be skipped only because
+    # this class overrode `state` wholesale.
+    _attr_device_class = SensorDeviceClass.ENERGY_STORAGE
     _attr_state_class = SensorStateClass.MEASUREMENT
-    
-    @callback
-    def _handle_coordinator_update(self):
-        """Handle updated data from the coordinator."""
-        if self.coordinator.data is not None:
-            try:
-                self._state = float(self.coordinator.data.devTemp)
-            except (ValueError, TypeError):
-                self._state = 0
-        self.async_write_ha_state()
+
+    def _value_from(self, data: ReturnOutputData) -> float | None:
+        """From device info rather than the poll; unknown while there is none."""
+        device_info = self.coordinator.device_info
+        if device_info is None:
+            return None
+        try:
+            return float(device_info.batteryCapacity)
+        except (ValueError, TypeError):
+            return 0
@@ -11,11 +11,25 @@ import aiohttp
 class APsystemsEZHI:
     """API client for APsystems EZHI Inverter."""
 
-    def __init__(self, ip_address: str, timeout: int = 10):
-        """Initialize the APsystems EZHI API client."""
+    def __init__(
+        self,
+        ip_address: str,
+        timeout: int = 10,
+        session: Optional[aiohttp.ClientSession] = None,
+    ):
+        """Initialize the APsystems EZHI API client.
+
+        A session passed in stays the caller's to close; without one, a
+        session is opened on the first request and closed by close().
+        """
         self.ip_address = ip_address
         self.timeout = timeout
-        self.session = None
+        self.session = session
+        self._owns_session = session is None
+        # The same per-request deadline the integration's client uses, built
+        # once and handed to aiohttp rather than an asyncio.timeout() block
+        # per request. It applies to a session passed in as well.
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
 
     async def _request(self, endpoint: str, params: Optional[dict] = None) -> dict:
         """Make a request to the API."""
@@ -24,8 +38,9 @@ class APsystemsEZHI:
             
         url = f"http://{self.ip_address}/{endpoint}"
         try:
-            async with asyncio.timeout(self.timeout):
-                response = await self.session.get(url, params=params)
+            async with self.session.get(
+                url, params=params, timeout=self._timeout
+            ) as response:
                 response.raise_for_status()
                 return await response.json()
         except Exception as error:
@@ -33,8 +48,8 @@ class APsystemsEZHI:
             raise
         
     async def close(self):
-        """Close the session."""
-        if self.session:
+        """Close the session, if it is ours."""
+        if self.session and self._owns_session:
             await self.session.close()
             self.session = None
 
@@ -64,8 +79,9 @@ async def main():
     """Run main function."""
     if len(sys.argv) < 2:
         print("Usage: python test_api.py <inverter_ip> [command] [param]")
-        print("Commands: info, output, alarm, get_power, set_power")
+        print("Commands: info, output, alarm, get_power, set_power, all")
         print("Example: python test_api.py 192.168.1.100 info")
+        print("Example: python test_api.py 192.168.1.100 all")
         print("Example: python test_api.py 192.168.1.100 set_power 600")
         return
 
@@ -73,31 +89,55 @@ async def main():
     command = sys.argv[2] if len(sys.argv) > 2 else "info"
     param = sys.argv[3] if len(sys.argv) > 3 else None
     
-    api = APsystemsEZHI(ip_address=ip)
-    
-    try:
-        if command == "info":
-            result = await api.get_device_info()
-            print(json.dumps(result, indent=2))
-            # Highlight battery capacity specifically
-            if "data" in result and "batteryCapacity" in result["data"]:
-                print(f"\nBattery capacity: {result['data']['batteryCapacity']} kWh")
-        elif command == "output":
-            result = await api.get_output_data()
-            print(json.dumps(result, indent=2))
-        elif command == "alarm":
-            result = await api.get_alarm()
-            print(json.dumps(result, indent=2))
-        elif command == "get_power":
-            result = await api.get_power()
-            print(f"Current power setting: {result}W")
-        elif command == "set_power" and param:
-            result = await api.set_power(int(param))
-            print(json.dumps(result, indent=2))
-        else:
-            print(f"Unknown command: {command}")
-    finally:
-        await api.close()
+    # One small pool for the single host, with DNS answers cached: every
+    # request of a run reuses the same keep-alive connection.
+    connector = aiohttp.TCPConnector(limit=4, ttl_dns_cache=300, keepalive_timeout=30)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        await run_command(APsystemsEZHI(ip_address=ip, session=session), command, param)
+
+
+async def run_command(api: APsystemsEZHI, command: str, param: Optional[str]) -> None:
+    """Run one command against the inverter and print the result."""
+    if command == "info":
+        result = await api.get_device_info()
+        print(json.dumps(result, indent=2))
+        # Highlight battery capacity specifically
+        if "data" in result and "batteryCapacity" in result["data"]:
+            print(f"\nBattery capacity: {result['data']['batteryCapacity']} kWh")
+    elif command == "output":
+        result = await api.get_output_data()
+        print(json.dumps(result, indent=2))
+    elif command == "alarm":
+        result = await api.get_alarm()
+        print(json.dumps(result, indent=2))
+    elif command == "get_power":
+        result = await api.get_power()
+        print(f"Current power setting: {result}W")
+    elif command == "all":
+        # The four reads are independent: issued together they cost one
+        # round trip to the inverter rather than four in a row. A failing
+        # endpoint must not throw away the other three answers, so each
+        # error is printed in place of its result.
+        names = ("info", "output", "alarm", "power")
+        results = await asyncio.gather(
+            api.get_device_info(),
+            api.get_output_data(),
+            api.get_alarm(),
+            api.get_power(),
+            return_exceptions=True,
+        )
+        print(json.dumps(
+            {
+                name: f"error: {result!r}" if isinstance(result, Exception) else result
+                for name, result in zip(names, results)
+            },
+            indent=2,
+        ))
+    elif command == "set_power" and param:
+        result = await api.set_power(int(param))
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"Unknown command: {command}")
 
 
 if __name__ == "__main__":
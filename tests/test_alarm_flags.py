@@ -8,10 +8,13 @@ Home Assistant entity stack is not needed.
 from __future__ import annotations
 
 import importlib.util
+import json
 import sys
 import types
 from pathlib import Path
 
+import pytest
+
 _COMPONENT = (
     Path(__file__).resolve().parents[1] / "custom_components" / "apsystems_ezhi_local"
 )
@@ -26,6 +29,12 @@ if "aiohttp" not in sys.modules:
     _aiohttp.ClientError = type("ClientError", (Exception,), {})
     _aiohttp.ClientSession = object
     sys.modules["aiohttp"] = _aiohttp
+# orjson likewise: Home Assistant ships it, a bare interpreter does not, and
+# api.py only hands orjson.loads to a response it never gets here.
+if "orjson" not in sys.modules:
+    _orjson = types.ModuleType("orjson")
+    _orjson.loads = json.loads
+    sys.modules["orjson"] = _orjson
 
 _spec = importlib.util.spec_from_file_location("ezhi_api", _COMPONENT / "api.py")
 api = importlib.util.module_from_spec(_spec)
@@ -53,12 +62,7 @@ LIVE_PAYLOAD = {
 
 def _parse(payload: dict) -> api.ReturnAlarmData:
     """What get_alarm does to a response body, without the HTTP round trip."""
-    return api.ReturnAlarmData(
-        **{
-            name: payload.get(name, "" if name in ("BCC", "BCI", "VRP") else "0")
-            for name in api.ReturnAlarmData.__dataclass_fields__
-        }
-    )
+    return api.parse_alarm_data(payload)
 
 
 def test_the_device_reports_twenty_alarm_fields():
@@ -70,9 +74,9 @@ def test_the_device_reports_twenty_alarm_fields():
 
 def test_live_payload_parses_with_no_alarm_active():
     alarms = _parse(LIVE_PAYLOAD)
-    assert (alarms.BCC, alarms.BCI, alarms.VRP) == ("0", "0", "0")
+    assert (alarms.BCC, alarms.BCI, alarms.VRP) == (0, 0, 0)
     assert not any(
-        str(getattr(alarms, f)) == "1" for f in api.ReturnAlarmData.__dataclass_fields__
+        getattr(alarms, f) == 1 for f in api.ReturnAlarmData.__dataclass_fields__
     )
 
 
@@ -82,7 +86,7 @@ def test_a_raised_alarm_reads_as_on():
 
 
 def test_firmware_without_the_field_reads_as_unknown_not_as_no_fault():
-    """The point of the "" default.
+    """The point of the None default.
 
     Older firmware simply does not send these. Reporting "off" would assert
     the absence of a fault the device never denied -- and for BCI, a battery
@@ -91,19 +95,53 @@ def test_firmware_without_the_field_reads_as_unknown_not_as_no_fault():
     older_firmware = {k: v for k, v in LIVE_PAYLOAD.items() if k not in ("BCC", "BCI", "VRP")}
     alarms = _parse(older_firmware)
 
-    assert (alarms.BCC, alarms.BCI, alarms.VRP) == ("", "", "")
+    assert (alarms.BCC, alarms.BCI, alarms.VRP) == (None, None, None)
     assert alarm_flag(alarms.BCI) is None
     assert alarm_flag(alarms.BCC) is None
     assert alarm_flag(alarms.VRP) is None
 
 
+def test_a_missing_classic_field_still_reads_as_clear():
+    """The seventeen original fields keep their old "absent means 0"."""
+    alarms = _parse({k: v for k, v in LIVE_PAYLOAD.items() if k != "BatHTP"})
+    assert alarms.BatHTP == 0
+    assert alarm_flag(alarms.BatHTP) is False
+
+
+def test_alarm_parse_edge_cases():
+    def bci(raw):
+        return alarm_flag(_parse({**LIVE_PAYLOAD, "BCI": raw}).BCI)
+
+    assert bci("1") is True
+    assert bci("0") is False
+    assert bci(1) is True
+    assert bci(0) is False
+    assert bci("") is None
+    assert bci(None) is None
+    # Anything the device could send that is neither "1" nor absent is not an
+    # alarm -- guessing "on" here would be a false problem report.
+    assert bci("unexpected") is False
+
+
 def test_alarm_flag_edge_cases():
-    assert alarm_flag("1") is True
-    assert alarm_flag("0") is False
     assert alarm_flag(1) is True
     assert alarm_flag(0) is False
-    assert alarm_flag("") is None
     assert alarm_flag(None) is None
-    # Anything the device could send that is neither "1" nor absent is not an
-    # alarm -- guessing "on" here would be a false problem report.
-    assert alarm_flag("unexpected") is False
+    assert alarm_flag(2) is False
+
+
+def test_parsed_alarm_data_is_frozen_and_compares_by_value():
+    """The coordinator relies on == to tell an unchanged poll from a new one."""
+    first, second = _parse(LIVE_PAYLOAD), _parse(dict(LIVE_PAYLOAD))
+    assert first == second
+    assert first != _parse({**LIVE_PAYLOAD, "EE": "1"})
+    with pytest.raises(AttributeError):
+        first.EE = 1
+
+
+def test_every_alarm_field_has_exactly_one_sensor():
+    """The spec table and the dataclass are kept in step by hand."""
+    codes = [code for _key, _name, code in _namespace["_ALARM_SPECS"]]
+    assert sorted(codes) == sorted(api.ReturnAlarmData.__dataclass_fields__)
+    keys = [key for key, _name, _code in _namespace["_ALARM_SPECS"]]
+    assert len(set(keys)) == len(keys)
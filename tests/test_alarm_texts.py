@@ -33,7 +33,8 @@ LIVE_FIELDS = {
 
 def _sensor_codes() -> list[str]:
     source = (_COMPONENT / "binary_sensor.py").read_text()
-    return re.findall(r'alarm_code="(\w+)"', source)
+    # The third column of each _ALARM_SPECS row: ("key", "Name", "Code").
+    return re.findall(r'^\s*\("\w+", "[^"]+", "(\w+)"\),', source, re.MULTILINE)
 
 
 def test_every_sensor_has_texts():
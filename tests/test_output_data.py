@@ -0,0 +1,149 @@
+"""Unit tests for parsing getOutputData, and for the sensor table showing it.
+
+Loaded by path like test_alarm_flags.py, with the same aiohttp/orjson stubs,
+so no network and no Home Assistant are needed.
+"""
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import importlib.util
+import json
+import re
+import sys
+import types
+from pathlib import Path
+
+_COMPONENT = (
+    Path(__file__).resolve().parents[1] / "custom_components" / "apsystems_ezhi_local"
+)
+
+# See test_alarm_flags.py: only the parser is under test, no request is made.
+if "aiohttp" not in sys.modules:
+    _aiohttp = types.ModuleType("aiohttp")
+    _aiohttp.ClientError = type("ClientError", (Exception,), {})
+    _aiohttp.ClientSession = object
+    sys.modules["aiohttp"] = _aiohttp
+if "orjson" not in sys.modules:
+    _orjson = types.ModuleType("orjson")
+    _orjson.loads = json.loads
+    sys.modules["orjson"] = _orjson
+
+_spec = importlib.util.spec_from_file_location("ezhi_api_output", _COMPONENT / "api.py")
+api = importlib.util.module_from_spec(_spec)
+sys.modules["ezhi_api_output"] = api
+_spec.loader.exec_module(api)
+
+
+# Shape of a live getOutputData answer: every number a string, batS at the root.
+LIVE_RESPONSE = {
+    "batS": "2",
+    "data": {
+        "batSoc": "57", "batSoh": "100", "batTemp": "24.5", "devTemp": "38",
+        "pvP": "412.3", "pvTE": "118.42", "batP": "-180", "batCTE": "61.2",
+        "batDTE": "55.9", "ogP": "230", "ogOTE": "48.7", "ogITE": "0.4",
+        "ofgP": "0", "ofgOTE": "1.1", "ofgITE": "0",
+    },
+    "message": "SUCCESS",
+}
+
+
+def test_the_field_table_matches_the_dataclass_order():
+    """parse_output_data passes the table positionally after batS."""
+    names = [f.name for f in dataclasses.fields(api.ReturnOutputData)]
+    assert names == ["batS"] + [name for name, _parse in api._OUTPUT_FIELDS]
+
+
+def test_live_response_parses_to_numbers():
+    data = api.parse_output_data(LIVE_RESPONSE)
+    assert data.batS == 2
+    assert data.batSoc == 57
+    assert data.batTemp == 24.5
+    assert data.batP == -180.0
+    assert data.pvTE == 118.42
+
+
+def test_missing_and_unparseable_readings_are_unknown():
+    data = api.parse_output_data({"data": {"pvP": "n/a", "pvTE": "nan", "ogP": "inf"}})
+    assert data.pvP is None
+    assert data.pvTE is None
+    assert data.ogP is None
+    assert data.batSoc is None
+    assert api.parse_output_data({"data": None}).ogP is None
+    # batS keeps its 0: the status sensor shows that as "Unknown (0)".
+    assert data.batS == 0
+
+
+def test_polls_with_an_unknown_reading_still_compare_equal():
+    """NaN would have made every such poll look changed."""
+    garbled = {"data": {**LIVE_RESPONSE["data"], "pvTE": "garbage"}}
+    assert api.parse_output_data(garbled) == api.parse_output_data(garbled)
+
+
+def test_identical_polls_compare_equal():
+    """The coordinator's always_update=False rests on this."""
+    assert api.parse_output_data(LIVE_RESPONSE) == api.parse_output_data(
+        json.loads(json.dumps(LIVE_RESPONSE))
+    )
+    changed = {**LIVE_RESPONSE, "data": {**LIVE_RESPONSE["data"], "ogP": "231"}}
+    assert api.parse_output_data(LIVE_RESPONSE) != api.parse_output_data(changed)
+
+
+# The sensor_ids the per-reading classes used. They are the tail of
+# every unique_id, so a typo in the table would orphan an entity's history.
+_HISTORICAL_METRIC_KEYS = {
+    "photovoltaic_power", "photovoltaic_energy", "battery_power", "battery_soc",
+    "battery_soh", "battery_temperature", "battery_charge_energy",
+    "battery_discharge_energy", "ongrid_power", "ongrid_output_energy",
+    "ongrid_input_energy", "offgrid_power", "offgrid_output_energy",
+    "offgrid_input_energy", "device_temperature",
+}
+
+
+def _metric_rows() -> list[tuple[str, str]]:
+    source = (_COMPONENT / "sensor.py").read_text(encoding="utf-8")
+    return re.findall(r'^\s*\("(\w+)", "[^"]+", "(\w+)",$', source, re.MULTILINE)
+
+
+def test_every_reading_has_exactly_one_metric_sensor():
+    """batS is left out: BatteryStatusSensor maps it to text."""
+    rows = _metric_rows()
+    fields = [field for _key, field in rows]
+    assert sorted(fields) == sorted(
+        name for name, _parse in api._OUTPUT_FIELDS
+    )
+
+
+def test_metric_sensor_keys_keep_their_unique_ids():
+    keys = [key for key, _field in _metric_rows()]
+    assert len(keys) == len(set(keys))
+    assert set(keys) == _HISTORICAL_METRIC_KEYS
+
+
+def test_getters_survive_a_null_data_object():
+    """.get("data", {}) passes a "data": null straight on as None, and the
+    AttributeError from the next .get() escaped _request_or_none."""
+    client = api.APsystemsEZHI.__new__(api.APsystemsEZHI)
+
+    async def _null_data(endpoint, params=None):
+        return {"data": None, "message": "SUCCESS"}
+
+    client._request_or_none = _null_data
+    info = asyncio.run(client.get_device_info())
+    assert info.deviceId == ""
+    assert asyncio.run(client.get_alarm()).BatE == 0
+    assert asyncio.run(client.get_power()) == 0
+    assert asyncio.run(client.get_output_data()).pvP is None
+
+
+def test_a_refused_power_write_is_logged(caplog):
+    """Neither caller looks at set_power's result, so the log is the one
+    place a refusal shows."""
+    client = api.APsystemsEZHI.__new__(api.APsystemsEZHI)
+
+    async def _refused(endpoint, params=None):
+        return {"data": {}, "message": "FAILED"}
+
+    client._request_or_none = _refused
+    assert asyncio.run(client.set_power(300)) is False
+    assert "did not accept 300 W: FAILED" in caplog.text
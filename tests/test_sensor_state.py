@@ -0,0 +1,140 @@
+"""What the local sensors report, without Home Assistant.
+
+sensor.py imports Home Assistant at module level, so -- as test_alarm_flags.py
+does for binary_sensor.py -- only the entity classes are executed here, on top
+of minimal stand-ins for the two base classes they use.
+"""
+from __future__ import annotations
+
+import __future__
+import importlib.util
+import json
+import sys
+import types
+from abc import ABCMeta, abstractmethod
+from operator import attrgetter
+from pathlib import Path
+
+import pytest
+
+_COMPONENT = (
+    Path(__file__).resolve().parents[1] / "custom_components" / "apsystems_ezhi_local"
+)
+
+# See test_alarm_flags.py: api.py is loaded only for its dataclasses and
+# parsers, to build the coordinator data the sensors read. No request is made.
+if "aiohttp" not in sys.modules:
+    _aiohttp = types.ModuleType("aiohttp")
+    _aiohttp.ClientError = type("ClientError", (Exception,), {})
+    _aiohttp.ClientSession = object
+    sys.modules["aiohttp"] = _aiohttp
+if "orjson" not in sys.modules:
+    _orjson = types.ModuleType("orjson")
+    _orjson.loads = json.loads
+    sys.modules["orjson"] = _orjson
+
+_spec = importlib.util.spec_from_file_location("ezhi_api_sensor", _COMPONENT / "api.py")
+api = importlib.util.module_from_spec(_spec)
+sys.modules["ezhi_api_sensor"] = api
+_spec.loader.exec_module(api)
+
+
+class _Entity(metaclass=ABCMeta):
+    """Stand-in for SensorEntity. Entity's metaclass is an ABCMeta too."""
+
+    def async_write_ha_state(self):
+        self.written.append((self.native_value, self.available))
+
+
+class _CoordinatorEntity:
+    """Stand-in for CoordinatorEntity: keeps the coordinator, and nothing
+    else -- in particular it does not run the update callback when added."""
+
+    def __init__(self, coordinator):
+        self.coordinator = coordinator
+        self.written = []
+
+    @property
+    def available(self):
+        return self.coordinator.last_update_success
+
+
+def _load_entity_classes() -> dict:
+    source = (_COMPONENT / "sensor.py").read_text(encoding="utf-8")
+    status_map = source[source.index("BATTERY_STATUS_MAP = {"):source.index("@dataclass")]
+    classes = source[source.index("class BaseSensor("):]
+    namespace = {
+        "abstractmethod": abstractmethod,
+        "attrgetter": attrgetter,
+        "callback": lambda func: func,
+        "CoordinatorEntity": _CoordinatorEntity,
+        "SensorEntity": _Entity,
+        "DeviceInfo": dict,
+        "DOMAIN": "apsystems_ezhi_local",
+        "SensorDeviceClass": types.SimpleNamespace(ENERGY_STORAGE="energy_storage"),
+        "SensorStateClass": types.SimpleNamespace(MEASUREMENT="measurement"),
+        "UnitOfEnergy": types.SimpleNamespace(KILO_WATT_HOUR="kWh"),
+    }
+    # sensor.py's annotations name Home Assistant types; like the module
+    # itself, leave them unevaluated.
+    flags = __future__.annotations.compiler_flag
+    exec(compile(status_map + classes, "sensor.py", "exec", flags=flags, dont_inherit=True), namespace)
+    return namespace
+
+
+_sensor = _load_entity_classes()
+
+_IDLE_POLL = api.parse_output_data({
+    "batS": "1",
+    "data": {"batSoc": "80", "batSoh": "98", "pvTE": "118.42", "ogP": "0"},
+})
+
+
+def _coordinator(data=_IDLE_POLL, device_info=None):
+    return types.SimpleNamespace(
+        data=data, device_info=device_info, last_update_success=True
+    )
+
+
+def _metric(coordinator, key: str, field: str):
+    description = types.SimpleNamespace(key=key, name=key, field=field)
+    return _sensor["EZHIMetricSensor"](coordinator, "EZHI", description)
+
+
+def test_a_freshly_added_sensor_shows_the_first_refresh():
+    """No update callback has run yet, and on an idle inverter none may come
+    for hours: the value must come straight from the data already loaded."""
+    coordinator = _coordinator(
+        device_info=api.ReturnDeviceInfo(
+            deviceId="E17", type="", devVer="", batteryCompany="",
+            batteryModel="", batteryCapacity="2.15", ssid="", ip="",
+        )
+    )
+    assert _metric(coordinator, "battery_soh", "batSoh").native_value == 98.0
+    assert _metric(coordinator, "photovoltaic_energy", "pvTE").native_value == 118.42
+    status = _sensor["BatteryStatusSensor"](coordinator, "EZHI", "Battery Status", "battery_status")
+    assert status.native_value == "Idle"
+    capacity = _sensor["BatteryCapacitySensor"](coordinator, "EZHI", "Battery Capacity", "battery_capacity")
+    assert capacity.native_value == 2.15
+
+
+def test_capacity_is_unknown_without_device_info():
+    capacity = _sensor["BatteryCapacitySensor"](_coordinator(), "EZHI", "Battery Capacity", "battery_capacity")
+    assert capacity.native_value is None
+
+
+def test_an_update_writes_only_what_changed():
+    coordinator = _coordinator()
+    soh = _metric(coordinator, "battery_soh", "batSoh")
+    soh._handle_coordinator_update()
+    soh._handle_coordinator_update()
+    assert soh.written == [(98.0, True)]
+
+    coordinator.last_update_success = False
+    soh._handle_coordinator_update()
+    assert soh.written[-1] == (98.0, False)
+
+
+def test_base_sensor_cannot_be_used_without_a_value():
+    with pytest.raises(TypeError):
+        _sensor["BaseSensor"](_coordinator(), "EZHI", "Nothing", "nothing")